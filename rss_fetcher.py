@@ -2,30 +2,267 @@ import os
 import json
 import time
 import html
+import io
 import smtplib
 import schedule
 import requests
 import feedparser
+import fastjsonschema
 import hashlib
 import re
 import uuid
+import random
 import base64
+import calendar
+import math
+import contextlib
 from datetime import datetime, timedelta
-from dateutil import parser
-from typing import Dict, List, Set, Tuple, Optional, Any, Union
-from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Set, Tuple, Optional, Any, Union, NamedTuple
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 from email.mime.text import MIMEText
 from email.mime.image import MIMEImage
 from email.mime.multipart import MIMEMultipart
 from email.header import Header
 import logging
+from requests.adapters import HTTPAdapter
 from urllib.parse import urljoin, urlparse
-from functools import wraps
+from functools import wraps, lru_cache
 import socket
 import sys
+import threading
 import traceback
+import xml.etree.ElementTree as ET
+
+try:
+    import orjson  # 可选依赖，C实现的JSON序列化
+except ImportError:
+    orjson = None
+
+try:
+    import blake3  # 可选依赖，SIMD加速的哈希算法
+except ImportError:
+    blake3 = None
+
+try:
+    from selectolax.lexbor import LexborHTMLParser  # 可选依赖，C实现的HTML解析器
+except ImportError:
+    LexborHTMLParser = None
 
 DEFAULT_TXT_DIR = "./rsspush"
+HTTP_POOL_SIZE = 16  # HTTP连接池大小
+IMAGE_DOWNLOAD_WORKERS = 8  # 并发下载图片的线程数
+DEFAULT_WORKER_THREADS = 32  # 并发获取RSS源的默认线程数，可通过配置项worker_threads修改
+SCHEDULE_JITTER_SECONDS = 30  # 定时任务首次执行的随机延迟上限，错开间隔相同的RSS源
+MAX_MESSAGES_PER_SMTP_SESSION = 100  # 单个SMTP会话最多发送的邮件数，超过后重新连接
+GUID_LOG_COMPACT_BYTES = 4096  # GUID追加日志超过该大小时合并回缓存文件
+MAX_PROCESSED_GUIDS = 100000  # 已处理GUID超过该数量时，只保留RSS源中仍然存在的GUID
+
+# 预编译的正则表达式，避免每次调用时重复编译
+_BLOCK_TAG_RE = re.compile(r'<(br)\s*/?>|</(p|div|h[1-5]|li)\s*>', re.IGNORECASE)  # 需要转换为换行的标签
+_ANY_TAG_RE = re.compile(r'<[^>]*>')
+_MULTI_NL_RE = re.compile(r'\n{3,}')
+_IFRAME_RE = re.compile(r'<iframe[^>]+src=[\'"]([^\'"]+)[\'"][^>]*>.*?</iframe>', re.DOTALL)
+_YT_EMBED_RE = re.compile(r'youtube\.com/embed/([^/?]+)')
+_SRC_RE = re.compile(r'''src=(?:"([^"]*)"|'([^']*)')''')  # 双引号或单引号形式的src属性
+
+# 图片与视频链接，一次扫描按命名分组区分
+_MEDIA_RE = re.compile(
+    r'''<img[^>]+src=['"](?P<img>[^'"]+)['"]'''
+    r'''|youtube\.com/watch\?v=(?P<yt_watch>[^&'"\s]+)'''
+    r'''|youtube\.com/embed/(?P<yt_embed>[^/?'"\s]+)'''
+    r'''|youtu\.be/(?P<youtu_be>[^/?'"\s]+)'''
+    r'''|vimeo\.com/(?P<vimeo>\d+)''',
+    re.IGNORECASE
+)
+
+# 块级标签替换为的换行符
+_TAG_NL = {
+    'br': '\n',
+    'p': '\n\n',
+    'div': '\n',
+    'h1': '\n',
+    'h2': '\n',
+    'h3': '\n',
+    'h4': '\n',
+    'h5': '\n',
+    'li': '\n',
+}
+
+# HTML邮件的头部（样式和摘要），CSS中的花括号已转义为{{ }}
+_HTML_HEAD_TEMPLATE = """
+        <html>
+        <head>
+            <style>
+                body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; max-width: 800px; margin: 0 auto; }}
+                h1 {{ color: #2c3e50; border-bottom: 1px solid #eee; padding-bottom: 10px; }}
+                h2 {{ color: #3498db; margin-top: 30px; }}
+                img {{ max-width: 100%; height: auto; margin: 10px 0; border-radius: 4px; }}
+                .entry {{ margin-bottom: 30px; border-bottom: 1px solid #eee; padding-bottom: 20px; }}
+                .meta {{ font-size: 0.9em; color: #7f8c8d; margin-bottom: 15px; }}
+                .content {{ margin-top: 15px; }}
+                a {{ color: #3498db; text-decoration: none; }}
+                a:hover {{ text-decoration: underline; }}
+                .separator {{ margin: 30px 0; border-top: 1px dashed #ccc; }}
+                .video-container {{ position: relative; padding-top: 10px; height: 0; overflow: hidden; margin: 15px 0; }}
+                .video-container iframe, .video-container object, .video-container embed {{ position: absolute; top: 0; left: 0; width: 100%; height: 100%; }}
+                .summary {{ background-color: #f9f9f9; padding: 15px; border-left: 4px solid #3498db; margin: 15px 0; }}
+                .footer {{ margin-top: 30px; padding-top: 15px; border-top: 1px solid #eee; font-size: 0.9em; color: #7f8c8d; }}
+            </style>
+        </head>
+        <body>
+            <h1>RSS更新 - {name}</h1>
+            <div class="summary">
+                <p>更新时间: {update_time}</p>
+                <p>RSS源: {url}</p>
+                <p>新增文章数: {count}</p>
+            </div>
+        """
+
+# HTML邮件的页脚
+_HTML_FOOT = """
+            <div class="footer">
+                此邮件由RSS订阅自动发送。
+            </div>
+        </body></html>"""
+
+# 配置文件的JSON Schema，模块导入时编译为校验函数，重新加载配置时无需重复编译
+_EMAIL_PATTERN = r'^[^@\s]+@[^@\s]+\.[^@\s]+$'
+_POSITIVE_INT = {'type': 'integer', 'minimum': 1}
+_CONFIG_SCHEMA = {
+    'type': 'object',
+    'required': ['email_config', 'rss_sources'],
+    'properties': {
+        'email_config': {
+            'type': 'object',
+            'required': ['smtp_server', 'smtp_port', 'sender_email', 'sender_password', 'receiver_emails'],
+            'properties': {
+                'smtp_server': {'type': 'string', 'minLength': 1},
+                'smtp_port': {'type': 'integer', 'minimum': 1, 'maximum': 65535},
+                'sender_email': {'type': 'string', 'pattern': _EMAIL_PATTERN},
+                'sender_password': {'type': 'string'},
+                'receiver_emails': {
+                    'type': 'array',
+                    'minItems': 1,
+                    'items': {'type': 'string', 'pattern': _EMAIL_PATTERN}
+                }
+            }
+        },
+        'base_rss_url': {'type': 'string'},
+        'worker_threads': _POSITIVE_INT,
+        'rss_sources': {
+            'type': 'array',
+            'minItems': 1,
+            'items': {
+                'type': 'object',
+                'required': ['name', 'url'],
+                'properties': {
+                    'name': {'type': 'string', 'minLength': 1},
+                    'url': {'type': 'string', 'minLength': 1},
+                    'save_dir': {'type': 'string'},
+                    'txt_dir': {'type': 'string'},
+                    'interval_minutes': _POSITIVE_INT,
+                    'max_cache_days': _POSITIVE_INT,
+                    'max_image_size_mb': {'type': 'number', 'exclusiveMinimum': 0},
+                    'max_images_per_mail': _POSITIVE_INT,
+                    'max_feed_size_mb': {'type': 'number', 'exclusiveMinimum': 0}
+                }
+            }
+        }
+    }
+}
+_validate_config_schema = fastjsonschema.compile(_CONFIG_SCHEMA)
+# JSON Schema的integer类型接受3.0这样的浮点数，这些字段需另外检查为int
+_INT_SOURCE_FIELDS = ('interval_minutes', 'max_cache_days', 'max_images_per_mail')
+
+def _json_dumps(obj, newline: bool = False) -> bytes:
+    """将对象序列化为紧凑的UTF-8 JSON字节串，优先使用orjson
+    
+    Args:
+        obj: 要序列化的对象
+        newline: 是否在末尾追加换行（用于NDJSON）
+    """
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if newline:
+            option |= orjson.OPT_APPEND_NEWLINE
+        return orjson.dumps(obj, option=option)
+    data = json.dumps(obj, ensure_ascii=False, separators=(',', ':'))
+    if newline:
+        data += '\n'
+    return data.encode('utf-8')
+
+def _json_loads(data: Union[bytes, str]) -> Any:
+    """解析JSON字节串或字符串，优先使用orjson"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def _hash_hex(data: bytes) -> str:
+    """计算数据的十六进制摘要，优先使用blake3，否则使用hashlib.sha256（支持SHA-NI硬件加速）"""
+    if blake3 is not None:
+        return blake3.blake3(data).hexdigest()
+    return hashlib.sha256(data).hexdigest()
+
+def _create_http_session(pool_size: int = HTTP_POOL_SIZE) -> requests.Session:
+    """创建复用连接的HTTP会话，避免每个请求都重新建立TCP/TLS连接
+    
+    Args:
+        pool_size: 每个主机最多保持的连接数，应不小于同时访问该主机的线程数
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=pool_size, max_retries=0)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    # 添加User-Agent头，减少被拒绝的可能性
+    session.headers['User-Agent'] = 'RSS-Fetcher/1.0 (https://github.com/Hcyyy0120/rss-push-2-email)'
+    return session
+
+@contextlib.contextmanager
+def _atomic_open(path: str):
+    """以二进制方式写入临时文件，成功后原子地替换目标文件，出错时删除临时文件
+    
+    临时文件名带随机后缀，多个线程同时写入同一文件时互不影响。
+    """
+    tmp_path = f"{path}.{uuid.uuid4().hex[:8]}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            yield f
+        os.replace(tmp_path, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(tmp_path)
+        raise
+
+_ATOM_NS = '{http://www.w3.org/2005/Atom}'
+
+def _peek_feed_guids(content: bytes) -> Optional[List[str]]:
+    """用ElementTree快速提取RSS 2.0或Atom源中各条目的guid/id
+    
+    无法解析、格式不是RSS 2.0/Atom或任一条目缺少guid/id时返回None，由调用方交给feedparser处理。
+    """
+    try:
+        root = ET.fromstring(content)
+    except Exception:
+        # 快速检查只是优化：解析错误、多字节编码（ValueError）、未知编码（LookupError）等都交给feedparser
+        return None
+    if root.tag == 'rss':
+        items, guid_tag = root.iterfind('channel/item'), 'guid'
+    elif root.tag == _ATOM_NS + 'feed':
+        items, guid_tag = root.iterfind(_ATOM_NS + 'entry'), _ATOM_NS + 'id'
+    else:
+        return None
+        
+    guids = []
+    for item in items:
+        guid = (item.findtext(guid_tag) or '').strip()
+        if not guid:
+            return None
+        guids.append(guid)
+    return guids
+
+def _tag_newline(match) -> str:
+    """返回_BLOCK_TAG_RE匹配到的标签对应的换行符"""
+    return _TAG_NL[(match.group(1) or match.group(2)).lower()]
 
 # 在文件顶部添加日志配置
 def setup_logger():
@@ -100,6 +337,93 @@ def retry(max_retries=3, delay=5, backoff=2, exceptions=(Exception,)):
         return wrapper
     return decorator
 
+class BloomFilter:
+    """可扩展的布隆过滤器，用固定比例的小内存记录大量已处理的GUID
+    
+    每一层是一个定长位数组，当前层写满后追加一个容量翻倍、误判率减半的新层，
+    总体误判率不超过error_rate。不会漏判已添加的元素，误判只会导致极少数新条目被当作已处理。
+    """
+    
+    def __init__(self, initial_capacity: int = 10000, error_rate: float = 0.001):
+        self.initial_capacity = initial_capacity
+        self.error_rate = error_rate
+        # 每层为 [位数组, 位数, 哈希函数个数, 容量, 已添加数量]
+        self._filters: List[list] = []
+        
+    def _add_filter(self):
+        """追加一层新的位数组"""
+        level = len(self._filters)
+        capacity = self.initial_capacity * (2 ** level)
+        error_rate = self.error_rate * (0.5 ** (level + 1))
+        num_bits = int(math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        num_hashes = max(1, int(round(num_bits / capacity * math.log(2))))
+        self._filters.append([bytearray((num_bits + 7) // 8), num_bits, num_hashes, capacity, 0])
+        
+    @staticmethod
+    def _hashes(item: str) -> Tuple[int, int]:
+        """对元素计算两个64位哈希值，用双重哈希派生出k个位置"""
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        return int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little') | 1
+        
+    @staticmethod
+    def _positions(h1: int, h2: int, num_bits: int, num_hashes: int):
+        return ((h1 + i * h2) % num_bits for i in range(num_hashes))
+        
+    def _contains_hashes(self, h1: int, h2: int) -> bool:
+        for bits, num_bits, num_hashes, _, _ in self._filters:
+            if all(bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(h1, h2, num_bits, num_hashes)):
+                return True
+        return False
+        
+    def __contains__(self, item: str) -> bool:
+        return self._contains_hashes(*self._hashes(item))
+        
+    def add(self, item: str):
+        # 哈希值只计算一次，同时用于查重和置位
+        h1, h2 = self._hashes(item)
+        if self._contains_hashes(h1, h2):
+            return
+        if not self._filters or self._filters[-1][4] >= self._filters[-1][3]:
+            self._add_filter()
+        layer = self._filters[-1]
+        bits = layer[0]
+        for pos in self._positions(h1, h2, layer[1], layer[2]):
+            bits[pos >> 3] |= 1 << (pos & 7)
+        layer[4] += 1
+        
+    def update(self, items):
+        add = self.add
+        for item in items:
+            add(item)
+            
+    def __len__(self) -> int:
+        """已添加的元素数量（近似值）"""
+        return sum(layer[4] for layer in self._filters)
+        
+    def dump(self, f):
+        """写入二进制文件：第一行为JSON格式的参数，之后依次为各层位数组"""
+        header = {
+            'initial_capacity': self.initial_capacity,
+            'error_rate': self.error_rate,
+            'filters': [layer[1:] for layer in self._filters]
+        }
+        f.write(_json_dumps(header, newline=True))
+        for layer in self._filters:
+            f.write(layer[0])
+            
+    @classmethod
+    def load(cls, f) -> 'BloomFilter':
+        """从dump写入的二进制文件中读取"""
+        header = _json_loads(f.readline())
+        bloom = cls(header['initial_capacity'], header['error_rate'])
+        for num_bits, num_hashes, capacity, count in header['filters']:
+            size = (num_bits + 7) // 8
+            bits = bytearray(f.read(size))
+            if len(bits) != size:
+                raise ValueError("布隆过滤器文件不完整")
+            bloom._filters.append([bits, num_bits, num_hashes, capacity, count])
+        return bloom
+
 class EmailSender:
     def __init__(self, config):
         self.config = config
@@ -113,15 +437,83 @@ class EmailSender:
             # 兼容旧配置
             self.receiver_emails = [config['receiver_email']]
         
+        # 持久化的SMTP连接，多封邮件共用一次TLS握手和登录
+        self._smtp: Optional[smtplib.SMTP_SSL] = None
+        self._lock = threading.Lock()
+        self._messages_sent = 0
+        self._batch_depth = 0  # 当前进行中的发送批次数
+        
+    def _ensure_conn(self) -> smtplib.SMTP_SSL:
+        """确保存在可用的SMTP连接，必要时重新连接并登录（调用方需持有锁）"""
+        if self._smtp is not None and self._messages_sent >= MAX_MESSAGES_PER_SMTP_SESSION:
+            logger.debug(f"SMTP会话已发送{self._messages_sent}封邮件，重新建立连接")
+            self._close_conn()
+            
+        if self._smtp is not None:
+            try:
+                if self._smtp.noop()[0] != 250:
+                    self._close_conn()
+            except (smtplib.SMTPException, socket.error):
+                self._close_conn()
+                
+        if self._smtp is None:
+            server = smtplib.SMTP_SSL(self.smtp_server, self.smtp_port, timeout=30)
+            try:
+                server.login(self.sender_email, self.sender_password)
+            except Exception:
+                server.close()
+                raise
+            self._smtp = server
+            self._messages_sent = 0
+            logger.debug(f"已连接SMTP服务器: {self.smtp_server}:{self.smtp_port}")
+            
+        return self._smtp
+        
+    def _close_conn(self):
+        """关闭当前SMTP连接（调用方需持有锁）"""
+        if self._smtp is None:
+            return
+        try:
+            self._smtp.quit()
+        except Exception:
+            try:
+                self._smtp.close()
+            except Exception:
+                pass
+        self._smtp = None
+        
+    def close(self):
+        """关闭SMTP连接，在程序退出时调用"""
+        with self._lock:
+            self._close_conn()
+            
+    @contextlib.contextmanager
+    def batch(self):
+        """在一批邮件发送期间共用同一个SMTP连接，最后一个批次结束时关闭连接
+        
+        多个线程可以同时进入批次，同一轮定时任务中并发获取的RSS源只需一次TLS握手和登录，
+        连接也不会在两轮定时任务之间空闲占用。
+        """
+        with self._lock:
+            self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._batch_depth -= 1
+                if self._batch_depth == 0:
+                    self._close_conn()
+        
     @retry(max_retries=3, delay=5, exceptions=(smtplib.SMTPException, socket.error, TimeoutError))
-    def send_email(self, subject: str, content: str, html_content: str = None, images: List[Tuple[str, bytes]] = None):
+    def send_email(self, subject: str, content: str, html_content: str = None, images: List[Tuple[str, bytes, str]] = None):
         """发送邮件，支持HTML和嵌入图片
         
         Args:
             subject: 邮件主题
             content: 纯文本内容
             html_content: HTML格式内容（可选）
-            images: 要嵌入的图片列表，每项为(content_id, image_data)元组
+            images: 要嵌入的图片列表，每项为(content_id, image_data, subtype)元组，
+                subtype为图片的MIME子类型（如png）
         """
         try:
             # 创建邮件对象
@@ -139,28 +531,26 @@ class EmailSender:
             
             # 如果有图片，添加到邮件中
             if images:
-                for cid, img_data in images:
+                for cid, img_data, subtype in images:
                     try:
-                        image = MIMEImage(img_data)
+                        # 直接指定子类型，跳过MIMEImage对图片格式的探测
+                        image = MIMEImage(img_data, _subtype=subtype)
+                        ext = 'jpg' if subtype == 'jpeg' else subtype.split('+', 1)[0]
                         image.add_header('Content-ID', f'<{cid}>')
-                        image.add_header('Content-Disposition', 'inline', filename=f'image_{cid}.jpg')
+                        image.add_header('Content-Disposition', 'inline', filename=f'image_{cid}.{ext}')
                         msg.attach(image)
                     except Exception as e:
                         logger.warning(f"添加图片时出错: {str(e)}")
             
-            # 连接SMTP服务器并发送
-            server = smtplib.SMTP_SSL(self.smtp_server, self.smtp_port, timeout=30)
-            try:
-                server.login(self.sender_email, self.sender_password)
-                server.send_message(msg, from_addr=self.sender_email, to_addrs=self.receiver_emails)
-                # 在发送过程中需要手动调用server.quit()方法关闭会话，否则会报一个错误
-                server.quit()
-            except Exception as e:
+            # 复用SMTP连接发送，连接断开时丢弃并交给retry装饰器重连
+            with self._lock:
                 try:
-                    server.quit()
-                except:
-                    pass
-                raise e
+                    server = self._ensure_conn()
+                    server.send_message(msg, from_addr=self.sender_email, to_addrs=self.receiver_emails)
+                    self._messages_sent += 1
+                except (smtplib.SMTPServerDisconnected, socket.error):
+                    self._close_conn()
+                    raise
                 
             logger.info(f"邮件已发送: {subject}")
             return True
@@ -172,75 +562,185 @@ class EmailSender:
 class RSSFetcher:
     def __init__(self, name: str, url: str, email_sender: EmailSender, base_url: str = '', 
                  save_dir: str = 'data', txt_dir: str = None, max_cache_days: int = 30,
-                 max_image_size_mb: float = 10.0, max_images_per_mail: int = 20):
+                 max_image_size_mb: float = 10.0, max_images_per_mail: int = 20,
+                 max_feed_size_mb: Optional[float] = None, session: Optional[requests.Session] = None):
         self.name = name
         self.url = url
         self.base_url = base_url
         self.save_dir = save_dir
         self.txt_dir = txt_dir or DEFAULT_TXT_DIR  # text_dir 是txt文件的保存路径
-        self.processed_guids = set()  # 用于存储已处理的条目GUID
-        self.cache_file = os.path.join(save_dir, f"{name}_processed_guids.json")
+        self.processed_guids = BloomFilter()  # 用于记录已处理的条目GUID
+        self.cache_file = os.path.join(save_dir, f"{name}_processed_guids.json")  # 旧版本的GUID列表，仅用于迁移
+        self.bloom_file = self.cache_file + '.bloom'  # 已处理GUID的布隆过滤器
+        self.guid_log_file = self.cache_file + '.log'  # 新增GUID的追加日志
+        self.img_cache_dir = os.path.join(save_dir, 'img_cache')  # 已下载图片的磁盘缓存
+        self.meta_file = os.path.join(save_dir, f"{name}_meta.json")  # ETag等条件请求信息
+        self._etag: Optional[str] = None
+        self._last_modified: Optional[str] = None
+        self._body_hash: Optional[str] = None  # 上次处理完成的响应内容摘要
+        self._guid_append_f = None
+        self._guid_log_count = 0
+        self._guid_lock = threading.Lock()  # 同一获取器可能被多个线程同时执行
         
         # 资源限制参数
         self.max_cache_days = max_cache_days  # 缓存最长保留天数
         self.max_image_size_mb = max_image_size_mb  # 单张图片最大大小(MB)
         self.max_images_per_mail = max_images_per_mail  # 每封邮件最大图片数
+        self.max_feed_size_mb = max_feed_size_mb  # RSS响应内容最大大小(MB)，None表示不限制
+        
+        # HTTP会话，多个获取器可共用同一个会话，访问同一主机的RSS源共享连接池
+        self._session = session or _create_http_session()
         
         # 创建保存目录
-        for directory in [save_dir, self.txt_dir]:
-            if directory and not os.path.exists(directory):
+        for directory in (save_dir, self.txt_dir):
+            if directory:
                 os.makedirs(directory, exist_ok=True)
                 
-        # 加载已处理的GUID缓存
+        # 加载已处理的GUID缓存和条件请求信息
         self.load_processed_guids()
+        self.load_feed_meta()
         self.email_sender = email_sender
         
         # 清理旧缓存
         self.cleanup_old_cache()
             
     def load_processed_guids(self):
-        """加载已处理的GUID缓存"""
+        """加载已处理的GUID缓存：先读取布隆过滤器（或迁移旧版GUID列表），再回放追加日志"""
         try:
-            if os.path.exists(self.cache_file):
-                with open(self.cache_file, 'r', encoding='utf-8') as f:
-                    self.processed_guids = set(json.load(f))
+            if os.path.exists(self.bloom_file):
+                with open(self.bloom_file, 'rb') as f:
+                    self.processed_guids = BloomFilter.load(f)
+            elif os.path.exists(self.cache_file):
+                with open(self.cache_file, 'rb') as f:
+                    self.processed_guids.update(_json_loads(f.read()))
+                logger.info(f"[{self.name}] 已将旧版GUID缓存迁移到布隆过滤器 ({len(self.processed_guids)} 条)")
+                self.save_processed_guids()
+                    
+            if os.path.exists(self.guid_log_file):
+                with open(self.guid_log_file, 'rb') as f:
+                    for line in f:
+                        if line.strip():
+                            self.processed_guids.add(_json_loads(line))
+                            self._guid_log_count += 1
         except Exception as e:
             logger.error(f"[{self.name}] 加载GUID缓存出错: {str(e)}")
             
-    def save_processed_guids(self):
-        """保存已处理的GUID缓存"""
         try:
-            with open(self.cache_file, 'w', encoding='utf-8') as f:
-                json.dump(list(self.processed_guids), f)
+            self._guid_append_f = open(self.guid_log_file, 'ab', buffering=0)
+            self._maybe_compact_guid_log()
+        except Exception as e:
+            logger.error(f"[{self.name}] 打开GUID追加日志出错: {str(e)}")
+            
+    def load_feed_meta(self):
+        """加载上次获取RSS时服务器返回的ETag、Last-Modified及响应内容摘要"""
+        try:
+            if os.path.exists(self.meta_file):
+                with open(self.meta_file, 'rb') as f:
+                    meta = _json_loads(f.read())
+                self._etag = meta.get('etag')
+                self._last_modified = meta.get('last_modified')
+                self._body_hash = meta.get('body_hash')
+        except Exception as e:
+            logger.error(f"[{self.name}] 加载条件请求信息出错: {str(e)}")
+            
+    def _update_feed_validators(self, etag: Optional[str], last_modified: Optional[str], body_hash: Optional[str]):
+        """记录ETag、Last-Modified和响应内容摘要，有变化时才写入文件"""
+        if (etag, last_modified, body_hash) != (self._etag, self._last_modified, self._body_hash):
+            self._etag, self._last_modified, self._body_hash = etag, last_modified, body_hash
+            self.save_feed_meta()
+            
+    def save_feed_meta(self):
+        """保存ETag、Last-Modified和响应内容摘要，重启后仍可跳过未变化的RSS源"""
+        try:
+            with _atomic_open(self.meta_file) as f:
+                f.write(_json_dumps({
+                    'etag': self._etag,
+                    'last_modified': self._last_modified,
+                    'body_hash': self._body_hash
+                }))
+        except Exception as e:
+            logger.error(f"[{self.name}] 保存条件请求信息出错: {str(e)}")
+            
+    def save_processed_guids(self) -> bool:
+        """将布隆过滤器原子地写入缓存文件"""
+        try:
+            with _atomic_open(self.bloom_file) as f:
+                self.processed_guids.dump(f)
+            return True
         except Exception as e:
             logger.error(f"[{self.name}] 保存GUID缓存出错: {str(e)}")
+            return False
+            
+    def _append_processed_guids(self, guids: List[str]):
+        """将已加入processed_guids的新GUID持久化，只追加到日志，避免每次都重写完整集合"""
+        if not guids:
+            return
+        with self._guid_lock:
+            if self._guid_append_f is None:
+                self.save_processed_guids()
+                return
+            try:
+                self._guid_append_f.write(b''.join(_json_dumps(guid, newline=True) for guid in guids))
+                self._guid_log_count += len(guids)
+                self._maybe_compact_guid_log()
+            except Exception as e:
+                logger.error(f"[{self.name}] 追加GUID日志出错: {str(e)}")
+            
+    def _maybe_compact_guid_log(self):
+        """追加日志超过4KB或超过集合大小的25%时，合并回缓存文件并清空日志"""
+        log_size = self._guid_append_f.tell()
+        if log_size == 0:
+            return
+        if log_size <= GUID_LOG_COMPACT_BYTES and self._guid_log_count * 4 <= len(self.processed_guids):
+            return
+        if self.save_processed_guids():
+            self._truncate_guid_log()
+            logger.debug(f"[{self.name}] 已合并GUID追加日志 ({log_size} 字节)")
+            
+    def _truncate_guid_log(self):
+        """清空GUID追加日志，调用前需确保布隆过滤器已写入缓存文件"""
+        if self._guid_append_f is not None:
+            self._guid_append_f.seek(0)
+            self._guid_append_f.truncate()
+        self._guid_log_count = 0
+        
+    def _rotate_processed_guids(self, feed_guids: List[str]):
+        """已处理GUID超过MAX_PROCESSED_GUIDS时重建布隆过滤器，只保留RSS源中仍然存在的GUID
+        
+        RSS源只包含最近的条目，已从源中移除的GUID不会再被检查，丢弃它们不会导致重复发送。
+        调用方需持有_guid_lock。
+        """
+        old_count = len(self.processed_guids)
+        self.processed_guids = BloomFilter()
+        self.processed_guids.update(feed_guids)
+        if self.save_processed_guids():
+            self._truncate_guid_log()
+        logger.info(f"[{self.name}] 已处理GUID数量超过上限 ({old_count} > {MAX_PROCESSED_GUIDS})，仅保留RSS源中的 {len(self.processed_guids)} 条")
             
     def clean_html(self, text: str) -> str:
         """清理HTML标签和转义字符"""
         if not text:
             return ""
             
-        # 替换常见的HTML实体
-        text = safe_unescape(text)
-        
-        # 保留换行和段落结构
-        text = text.replace('<br>', '\n')
-        text = text.replace('<br/>', '\n')
-        text = text.replace('<br />', '\n')
-        text = text.replace('</p>', '\n\n')
-        text = text.replace('</div>', '\n')
-        text = text.replace('</h1>', '\n')
-        text = text.replace('</h2>', '\n')
-        text = text.replace('</h3>', '\n')
-        text = text.replace('</h4>', '\n')
-        text = text.replace('</h5>', '\n')
-        text = text.replace('</li>', '\n')
-        
-        # 移除所有HTML标签
-        text = re.sub(r'<[^>]*>', '', text)
+        # 先替换HTML实体，转义后的标签（如&lt;b&gt;）也会在下面被移除
+        # （正文不经过safe_unescape，避免大段文本占用其URL缓存）
+        if '&' in text:
+            text = html.unescape(text)
+            
+        # 纯文本描述没有标签时无需再处理
+        if '<' in text:
+            # 保留换行和段落结构，一次扫描替换所有块级标签
+            text = _BLOCK_TAG_RE.sub(_tag_newline, text)
+            
+            if LexborHTMLParser is not None:
+                # 由解析器提取文本，同时处理注释和CDATA
+                text = LexborHTMLParser(text).text(separator='')
+            else:
+                # 移除所有HTML标签
+                text = _ANY_TAG_RE.sub('', text)
         
         # 移除多余的空行
-        text = re.sub(r'\n{3,}', '\n\n', text)
+        text = _MULTI_NL_RE.sub('\n\n', text)
         
         # 移除前导和尾随的空白字符
         return text.strip()
@@ -251,36 +751,70 @@ class RSSFetcher:
             return
             
         try:
+            self._prepare_entries(new_entries)
+            
             # 构建文件名
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
             filename = f"{self.name}_update_{timestamp}.txt"
             file_path = os.path.join(self.txt_dir, filename)
             
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(f"=== RSS更新 - {self.name} ===\n")
-                f.write(f"更新时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-                f.write(f"RSS源: {self.url}\n")
-                f.write(f"新增文章数: {len(new_entries)}\n\n")
+            # 在内存中拼接完整内容，编码一次后一次写入
+            parts = [
+                f"=== RSS更新 - {self.name} ===\n",
+                f"更新时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n",
+                f"RSS源: {self.url}\n",
+                f"新增文章数: {len(new_entries)}\n\n"
+            ]
+            
+            # 写入每篇新文章
+            for entry in new_entries:
+                parts.extend([
+                    f"发布时间: {entry.get('published', '')}\n",
+                    f"作者: {entry.get('author', '')}\n",
+                    f"标题: {entry.get('title', '')}\n",
+                    f"链接: {safe_unescape(entry.get('link', ''))}\n",
+                    f"内容:\n{entry['_cleaned']}\n",  # 清理后的描述
+                    "\n" + "="*50 + "\n\n"
+                ])
                 
-                # 写入每篇新文章
-                for entry in new_entries:
-                    f.write(f"发布时间: {entry.get('published', '')}\n")
-                    f.write(f"作者: {entry.get('author', '')}\n")
-                    f.write(f"标题: {entry.get('title', '')}\n")
-                    f.write(f"链接: {safe_unescape(entry.get('link', ''))}\n")
-                    
-                    # 清理并写入描述
-                    description = self.clean_html(entry.get('description', ''))
-                    f.write(f"内容:\n{description}\n")
-                    f.write("\n" + "="*50 + "\n\n")
+            with open(file_path, 'wb') as f:
+                f.write(''.join(parts).encode('utf-8'))
                     
             logger.info(f"[{self.name}] 发现{len(new_entries)}篇新文章，已保存到: {file_path}")
             
         except Exception as e:
             logger.error(f"[{self.name}] 保存新文章时出错: {str(e)}")
             
+    def _prepare_entries(self, entries):
+        """预处理条目：格式化发布时间，每个描述只清理和提取图片一次，结果存入条目的_cleaned和_images字段
+        
+        保存文本文件、生成纯文本邮件和下载图片都直接复用这些结果，已预处理的条目会被跳过。
+        """
+        base_url = None
+        for entry in entries:
+            # 尝试获取基础URL
+            if not base_url and 'link' in entry:
+                try:
+                    parsed_url = urlparse(entry['link'])
+                    base_url = f"{parsed_url.scheme}://{parsed_url.netloc}"
+                except:
+                    pass
+                    
+            if '_cleaned' in entry:
+                continue
+                
+            # feedparser已将发布时间解析为UTC的struct_time，直接格式化为本地时间
+            published_parsed = entry.get('published_parsed')
+            if published_parsed:
+                entry['published'] = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(calendar.timegm(published_parsed)))
+                
+            description = entry.get('description', '')
+            entry['_cleaned'] = self.clean_html(description)
+            entry['_images'] = self.extract_images_from_html(description, base_url) if description else []
+            
     def format_entries_for_email(self, entries) -> str:
         """格式化条目为邮件纯文本内容"""
+        self._prepare_entries(entries)
         content = []
         for entry in entries:
             content.append(f"标题: {entry.get('title', '')}")
@@ -288,7 +822,7 @@ class RSSFetcher:
             content.append(f"发布时间: {entry.get('published', '')}")
             content.append(f"链接: {safe_unescape(entry.get('link', ''))}")
             content.append("\n内容:")
-            content.append(self.clean_html(entry.get('description', '')))
+            content.append(entry['_cleaned'])
             content.append("\n" + "="*50 + "\n")
         return "\n".join(content)
     
@@ -305,54 +839,32 @@ class RSSFetcher:
         if image_map is None:
             image_map = {}
             
-        html_parts = []
+        buf = io.StringIO()
         
-        # 添加邮件样式
-        html_parts.append("""
-        <html>
-        <head>
-            <style>
-                body { font-family: Arial, sans-serif; line-height: 1.6; color: #333; max-width: 800px; margin: 0 auto; }
-                h1 { color: #2c3e50; border-bottom: 1px solid #eee; padding-bottom: 10px; }
-                h2 { color: #3498db; margin-top: 30px; }
-                img { max-width: 100%; height: auto; margin: 10px 0; border-radius: 4px; }
-                .entry { margin-bottom: 30px; border-bottom: 1px solid #eee; padding-bottom: 20px; }
-                .meta { font-size: 0.9em; color: #7f8c8d; margin-bottom: 15px; }
-                .content { margin-top: 15px; }
-                a { color: #3498db; text-decoration: none; }
-                a:hover { text-decoration: underline; }
-                .separator { margin: 30px 0; border-top: 1px dashed #ccc; }
-                .video-container { position: relative; padding-top: 10px; height: 0; overflow: hidden; margin: 15px 0; }
-                .video-container iframe, .video-container object, .video-container embed { position: absolute; top: 0; left: 0; width: 100%; height: 100%; }
-                .summary { background-color: #f9f9f9; padding: 15px; border-left: 4px solid #3498db; margin: 15px 0; }
-                .footer { margin-top: 30px; padding-top: 15px; border-top: 1px solid #eee; font-size: 0.9em; color: #7f8c8d; }
-            </style>
-        </head>
-        <body>
-            <h1>RSS更新 - """ + self.name + """</h1>
-            <div class="summary">
-                <p>更新时间: """ + datetime.now().strftime('%Y-%m-%d %H:%M:%S') + """</p>
-                <p>RSS源: """ + self.url + """</p>
-                <p>新增文章数: """ + str(len(entries)) + """</p>
-            </div>
-        """)
+        # 添加邮件样式和摘要
+        buf.write(_HTML_HEAD_TEMPLATE.format(
+            name=html.escape(self.name),
+            update_time=datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            url=html.escape(self.url),
+            count=len(entries)
+        ))
         
-        # 添加每个条目
+        # 添加每个条目，标题、作者等字段来自RSS源，需要转义
         for i, entry in enumerate(entries):
-            title = entry.get('title', '无标题')
-            author = entry.get('author', '未知作者')
-            published = entry.get('published', '')
+            title = html.escape(entry.get('title', '无标题'))
+            author = html.escape(entry.get('author', '未知作者'))
+            published = html.escape(entry.get('published', ''))
             link = safe_unescape(entry.get('link', ''))
             
-            html_parts.append(f'<div class="entry">')
-            html_parts.append(f'<h2><a href="{link}" target="_blank">{title}</a></h2>')
+            buf.write('<div class="entry">')
+            buf.write(f'<h2><a href="{html.escape(link, quote=True)}" target="_blank">{title}</a></h2>')
             
-            html_parts.append(f'<div class="meta">')
+            buf.write('<div class="meta">')
             if author:
-                html_parts.append(f'作者: {author} | ')
+                buf.write(f'作者: {author} | ')
             if published:
-                html_parts.append(f'发布时间: {published}')
-            html_parts.append('</div>')
+                buf.write(f'发布时间: {published}')
+            buf.write('</div>')
             
             # 处理内容
             description = entry.get('description', '')
@@ -362,28 +874,19 @@ class RSSFetcher:
                 
                 # 如果有图片映射表，替换图片URL为Content-ID引用
                 if image_map:
-                    for url, cid in image_map.items():
-                        if url in description:
-                            description = description.replace(f'src="{url}"', f'src="cid:{cid}"')
-                            description = description.replace(f"src='{url}'", f'src="cid:{cid}"')
+                    description = self.replace_image_urls_with_cids(description, image_map)
                 
-                html_parts.append(f'<div class="content">{description}</div>')
+                buf.write(f'<div class="content">{description}</div>')
             
-            html_parts.append('</div>')
+            buf.write('</div>')
             
             # 添加分隔符（除了最后一个条目）
             if i < len(entries) - 1:
-                html_parts.append('<div class="separator"></div>')
+                buf.write('<div class="separator"></div>')
         
         # 添加页脚
-        html_parts.append("""
-            <div class="footer">
-                此邮件由RSS订阅自动发送。
-            </div>
-        """)
-        
-        html_parts.append('</body></html>')
-        return ''.join(html_parts)
+        buf.write(_HTML_FOOT)
+        return buf.getvalue()
         
     def convert_video_embeds_to_thumbnails(self, html_content: str, article_url: str) -> str:
         """将视频嵌入标签转换为缩略图+链接，避免邮件中直接嵌入视频播放器
@@ -395,14 +898,11 @@ class RSSFetcher:
         Returns:
             转换后的HTML内容
         """
-        # 匹配iframe视频嵌入
-        iframe_pattern = r'<iframe[^>]+src=[\'"]([^\'"]+)[\'"][^>]*>.*?</iframe>'
-        
         def replace_iframe(match):
             iframe_src = match.group(1)
             # 检查是否为YouTube嵌入
             if 'youtube.com/embed/' in iframe_src:
-                video_id = re.search(r'youtube\.com/embed/([^/?]+)', iframe_src)
+                video_id = _YT_EMBED_RE.search(iframe_src)
                 if video_id:
                     video_id = video_id.group(1)
                     thumbnail_url = f"https://img.youtube.com/vi/{video_id}/hqdefault.jpg"
@@ -411,8 +911,8 @@ class RSSFetcher:
             # 默认返回链接
             return f'<a href="{article_url}" target="_blank">查看原文中的视频内容</a>'
             
-        # 替换所有iframe
-        return re.sub(iframe_pattern, replace_iframe, html_content)
+        # 替换所有iframe视频嵌入
+        return _IFRAME_RE.sub(replace_iframe, html_content)
     
     def send_new_entries_email(self, new_entries):
         """将新条目通过邮件发送，包含图片"""
@@ -420,6 +920,7 @@ class RSSFetcher:
             return
             
         subject = f"RSS更新 - {self.name} - {len(new_entries)}篇新文章"
+        self._prepare_entries(new_entries)
         
         # 准备纯文本内容
         plain_content = f"RSS源: {self.url}\n"
@@ -427,41 +928,21 @@ class RSSFetcher:
         plain_content += f"新增文章数: {len(new_entries)}\n\n"
         plain_content += self.format_entries_for_email(new_entries)
         
-        # 收集所有图片
-        all_images_urls = []
-        base_url = None
-        
-        # 提取所有条目中的图片URL
+        # 收集所有条目中的图片，同一URL只分配一个Content-ID
+        url_to_cid = {}  # URL到Content-ID的映射
         for entry in new_entries:
-            description = entry.get('description', '')
-            
-            # 尝试获取基础URL
-            if not base_url and 'link' in entry:
-                try:
-                    parsed_url = urlparse(entry['link'])
-                    base_url = f"{parsed_url.scheme}://{parsed_url.netloc}"
-                except:
-                    pass
-                    
-            # 提取图片URL
-            if description:
-                image_urls = self.extract_images_from_html(description, base_url)
-                all_images_urls.extend(image_urls)
+            for content_id, url in entry['_images']:
+                url_to_cid.setdefault(url, content_id)
         
-        # 下载图片
+        # 下载图片（已去重）
         downloaded_images = []
-        image_map = {}  # URL到Content-ID的映射
         
-        if all_images_urls:
-            logger.info(f"[{self.name}] 正在下载{len(all_images_urls)}张图片...")
-            downloaded_images = self.download_images(all_images_urls)
-            
-            # 创建URL到CID的映射
-            for cid, url in all_images_urls:
-                image_map[url] = cid
+        if url_to_cid:
+            logger.info(f"[{self.name}] 正在下载{len(url_to_cid)}张图片...")
+            downloaded_images = self.download_images([(cid, url) for url, cid in url_to_cid.items()])
         
         # 准备HTML内容
-        html_content = self.format_entries_for_html_email(new_entries, image_map)
+        html_content = self.format_entries_for_html_email(new_entries, url_to_cid)
         
         # 发送邮件
         self.email_sender.send_email(
@@ -478,29 +959,74 @@ class RSSFetcher:
             # 获取RSS内容
             full_url = self.base_url + self.url if self.url.startswith('/') else self.url
             
-            # 添加User-Agent头，减少被拒绝的可能性
             headers = {
-                'User-Agent': 'RSS-Fetcher/1.0 (https://github.com/Hcyyy0120/rss-push-2-email)',
-                'Accept': 'application/rss+xml, application/xml, text/xml, application/atom+xml'
+                'Accept': 'application/rss+xml, application/xml, text/xml, application/atom+xml',
+                'Accept-Encoding': 'gzip, deflate'
             }
             
+            # 条件请求：RSS源未更新时服务器返回304，无需下载和解析
+            if self._etag:
+                headers['If-None-Match'] = self._etag
+            if self._last_modified:
+                headers['If-Modified-Since'] = self._last_modified
+            
             logger.debug(f"[{self.name}] 正在获取RSS内容: {full_url}")
             
             # 确保URL安全
             full_url = safe_unescape(full_url)
             
-            response = requests.get(full_url, headers=headers, timeout=30)
-            response.raise_for_status()  # 抛出HTTP错误，让retry处理
+            # 通过会话复用与RSS源的连接；连接超时5秒，读取超时30秒。
+            # 以流的方式读取响应内容，中止读取时也保证连接被释放
+            with contextlib.closing(self._session.get(full_url, headers=headers, timeout=(5, 30), stream=True)) as response:
+                if response.status_code == 304:
+                    logger.debug(f"[{self.name}] RSS源未更新 (304 Not Modified)")
+                    # 304响应可能携带更新后的验证信息，未携带时保留原值
+                    self._update_feed_validators(
+                        response.headers.get('ETag', self._etag),
+                        response.headers.get('Last-Modified', self._last_modified),
+                        self._body_hash
+                    )
+                    return
+                response.raise_for_status()  # 抛出HTTP错误，让retry处理
+                
+                # 分块读取RSS内容，配置了大小上限时超过即中止，异常的RSS源不会占用大量内存
+                max_size_bytes = int(self.max_feed_size_mb * 1024 * 1024) if self.max_feed_size_mb else None
+                buf = bytearray()
+                for chunk in response.iter_content(chunk_size=65536):
+                    buf.extend(chunk)
+                    if max_size_bytes is not None and len(buf) > max_size_bytes:
+                        logger.warning(f"[{self.name}] RSS内容超过大小上限，已放弃本次获取: > {self.max_feed_size_mb}MB")
+                        return
+            content = bytes(buf)
+            
+            # 服务器不支持条件请求时，响应内容与上次处理完成时完全相同则无需再解析
+            body_hash = _hash_hex(content)
+            if body_hash == self._body_hash:
+                logger.debug(f"[{self.name}] RSS源内容未变化，跳过解析")
+                self._update_feed_validators(response.headers.get('ETag'), response.headers.get('Last-Modified'), body_hash)
+                return
             
             # 检查响应内容类型
             content_type = response.headers.get('Content-Type', '')
             logger.debug(f"[{self.name}] 响应内容类型: {content_type}")
             
-            feed = feedparser.parse(response.content)
+            # 快速检查：所有条目的GUID都已处理过时，无需交给feedparser完整解析
+            peeked_guids = _peek_feed_guids(content)
+            if peeked_guids:
+                with self._guid_lock:
+                    all_processed = all(guid in self.processed_guids for guid in peeked_guids)
+                if all_processed:
+                    logger.debug(f"[{self.name}] 没有新条目")
+                    self._update_feed_validators(response.headers.get('ETag'), response.headers.get('Last-Modified'), body_hash)
+                    return
+                    
+            feed = feedparser.parse(content)
             
             # 检查解析结果是否有效
             if not hasattr(feed, 'entries') or not feed.entries:
                 logger.warning(f"[{self.name}] 没有找到RSS条目，可能的原因：1.源地址错误 2.格式不是有效RSS/Atom 3.源暂时无法访问")
+                # 同样的内容下次直接返回304，无需重复下载和解析
+                self._update_feed_validators(response.headers.get('ETag'), response.headers.get('Last-Modified'), body_hash)
                 return
                 
             # 检查feed版本
@@ -511,18 +1037,21 @@ class RSSFetcher:
             if hasattr(feed, 'feed') and hasattr(feed.feed, 'title'):
                 logger.debug(f"[{self.name}] Feed标题: {feed.feed.title}")
             
-            # 检查新条目
-            new_entries = []
-            for entry in feed.entries:
-                guid = entry.get('guid', '') or entry.get('link', '') or entry.get('id', '')
-                if not guid:  # 如果没有可用的标识符，使用标题和发布日期组合
-                    title = entry.get('title', '')
-                    published = entry.get('published', '') or entry.get('updated', '')
-                    guid = f"{title}_{published}"
-                    
-                if guid and guid not in self.processed_guids:
-                    new_entries.append(entry)
-                    self.processed_guids.add(guid)
+            # 检查新条目：先计算全部GUID，再一次找出未处理的条目并批量记录
+            feed_guids = [self._entry_guid(entry) for entry in feed.entries]  # RSS源中的全部GUID
+            with self._guid_lock:
+                # GUID到条目的映射，保持RSS源中的顺序，重复的GUID只保留第一个条目
+                new_items = {}
+                for guid, entry in zip(feed_guids, feed.entries):
+                    if guid not in new_items and guid not in self.processed_guids:
+                        new_items[guid] = entry
+                new_guids = list(new_items)
+                new_entries = list(new_items.values())
+                self.processed_guids.update(new_guids)
+                        
+                # 限制已处理GUID的数量，避免长期运行后无限增长
+                if len(self.processed_guids) > MAX_PROCESSED_GUIDS:
+                    self._rotate_processed_guids(feed_guids)
             
             # 限制处理过多的新条目，以防RSS源突然包含大量历史内容
             if len(new_entries) > 20:
@@ -531,47 +1060,35 @@ class RSSFetcher:
             
             # 如果有新条目，保存并发送邮件
             if new_entries:
+                self._prepare_entries(new_entries)
                 self.save_new_entries_as_txt(new_entries)
-                self.save_processed_guids()
+                self._append_processed_guids(new_guids)
                 self.send_new_entries_email(new_entries)
                 
-                # 同时保存JSON格式（可选）
-                for entry in new_entries:
-                    # 解析日期（安全地获取published字段）
-                    date_str = datetime.now().strftime('%Y%m%d')  # 默认使用当前日期
-                    if 'published' in entry:
-                        try:
-                            published = parser.parse(entry.get('published'))
-                            date_str = published.strftime('%Y%m%d')
-                        except Exception as e:
-                            logger.warning(f"[{self.name}] 解析发布日期失败: {str(e)}")
-                    
-                    # 使用MD5哈希代替不可靠的hash函数
-                    link = safe_unescape(entry.get('link', ''))
-                    hash_str = hashlib.md5(link.encode('utf-8')).hexdigest()[:10]
-                    
-                    # 准备保存的数据
-                    item_data = {
+                # 同时保存JSON格式（可选），本次获取的新条目合并写入一个NDJSON文件
+                # 文件名带源名称，多个源共用save_dir时互不覆盖；同一秒内多次获取时追加写入
+                now = datetime.now()
+                fetch_time = now.isoformat()
+                file_path = os.path.join(self.save_dir, f"{self.name}_{now.strftime('%Y%m%d_%H%M%S')}.ndjson")
+                try:
+                    # 所有条目序列化后拼接，一次写入
+                    data = b''.join(_json_dumps({
                         'title': entry.get('title', ''),
-                        'link': link,
+                        'link': safe_unescape(entry.get('link', '')),
                         'published': entry.get('published', ''),
                         'description': entry.get('description', ''),
                         'content': entry.get('content', [{}])[0].get('value', '') if 'content' in entry else '',
-                        'fetch_time': datetime.now().isoformat()
-                    }
-                    
-                    # 构建文件名
-                    filename = f"{date_str}_{hash_str}.json"
-                    file_path = os.path.join(self.save_dir, filename)
-                    
-                    # 保存到文件
-                    try:
-                        with open(file_path, 'w', encoding='utf-8') as f:
-                            json.dump(item_data, f, ensure_ascii=False, indent=2)
-                    except Exception as e:
-                        logger.warning(f"[{self.name}] 保存条目到JSON时出错: {str(e)}")
+                        'fetch_time': fetch_time
+                    }, newline=True) for entry in new_entries)
+                    with open(file_path, 'ab') as f:
+                        f.write(data)
+                except Exception as e:
+                    logger.warning(f"[{self.name}] 保存条目到JSON时出错: {str(e)}")
             else:
                 logger.debug(f"[{self.name}] 没有新条目")
+                
+            # 处理完成后再记录ETag和Last-Modified，避免处理失败的内容下次被304跳过
+            self._update_feed_validators(response.headers.get('ETag'), response.headers.get('Last-Modified'), body_hash)
             
         except requests.exceptions.RequestException as e:
             logger.error(f"[{self.name}] 网络请求出错: {str(e)}")
@@ -581,8 +1098,18 @@ class RSSFetcher:
             logger.error(f"[{self.name}] 获取RSS内容时出错: {str(e)}")
             logger.error(traceback.format_exc())
 
+    @staticmethod
+    def _entry_guid(entry) -> str:
+        """返回条目的唯一标识：依次使用guid、link、id，都没有时使用标题和发布日期组合"""
+        guid = entry.get('guid', '') or entry.get('link', '') or entry.get('id', '')
+        if not guid:
+            title = entry.get('title', '')
+            published = entry.get('published', '') or entry.get('updated', '')
+            guid = f"{title}_{published}"
+        return guid
+        
     def extract_images_from_html(self, html_content: str, base_url: str = '') -> List[Tuple[str, str]]:
-        """从HTML内容中提取图片URL
+        """从HTML内容中提取图片URL和视频缩略图URL
         
         Args:
             html_content: HTML内容
@@ -594,61 +1121,40 @@ class RSSFetcher:
         if not html_content:
             return []
             
-        # 查找所有img标签
-        img_pattern = r'<img[^>]+src=[\'"]([^\'"]+)[\'"][^>]*>'
-        matches = re.findall(img_pattern, html_content)
-        
         results = []
-        for i, img_url in enumerate(matches):
-            # 解码HTML实体（关键修改）
-            img_url = safe_unescape(img_url)
-            
-            # 处理相对URL
-            if img_url.startswith('/') or not (img_url.startswith('http://') or img_url.startswith('https://')):
-                if base_url:
-                    img_url = urljoin(base_url, img_url)
-                else:
-                    continue  # 跳过无法解析的相对URL
-                    
-            # 生成唯一的Content-ID
-            content_id = f"img_{i}_{uuid.uuid4().hex[:8]}"
-            results.append((content_id, img_url))
+        img_index = 0
+        
+        # 一次扫描同时匹配img标签和YouTube、Vimeo等视频链接
+        for match in _MEDIA_RE.finditer(html_content):
+            group = match.lastgroup
+            value = match.group(group)
             
-        # 提取视频缩略图（YouTube, Vimeo等）
-        self.extract_video_thumbnails(html_content, results)
+            if group == 'img':
+                # 解码HTML实体（关键修改）
+                img_url = safe_unescape(value)
+                
+                # 处理相对URL
+                if img_url.startswith('/') or not (img_url.startswith('http://') or img_url.startswith('https://')):
+                    if base_url:
+                        img_url = urljoin(base_url, img_url)
+                    else:
+                        continue  # 跳过无法解析的相对URL
+                        
+                # 生成唯一的Content-ID
+                content_id = f"img_{img_index}_{uuid.uuid4().hex[:8]}"
+                img_index += 1
+                results.append((content_id, img_url))
+                
+            elif group == 'vimeo':
+                # Vimeo需要额外API调用获取缩略图，此处简化处理
+                logger.debug(f"检测到Vimeo视频ID: {value}，但需要API获取缩略图")
+                
+            else:
+                # YouTube缩略图URL格式
+                thumbnail_url = f"https://img.youtube.com/vi/{value}/hqdefault.jpg"
+                results.append((f"yt_{value}", thumbnail_url))
             
         return results
-        
-    def extract_video_thumbnails(self, html_content: str, results: List[Tuple[str, str]]) -> None:
-        """提取视频缩略图URL并添加到结果列表
-        
-        Args:
-            html_content: HTML内容
-            results: 结果列表，将直接修改此列表添加内容
-        """
-        # 提取YouTube视频ID
-        youtube_patterns = [
-            r'youtube\.com/watch\?v=([^&]+)',
-            r'youtube\.com/embed/([^/?]+)',
-            r'youtu\.be/([^/?]+)'
-        ]
-        
-        for pattern in youtube_patterns:
-            for match in re.finditer(pattern, html_content):
-                video_id = match.group(1)
-                if video_id:
-                    # YouTube缩略图URL格式
-                    thumbnail_url = f"https://img.youtube.com/vi/{video_id}/hqdefault.jpg"
-                    content_id = f"yt_{video_id}"
-                    results.append((content_id, thumbnail_url))
-                    
-        # 提取Vimeo视频ID (需要额外API调用获取缩略图，此处简化处理)
-        vimeo_pattern = r'vimeo\.com/(\d+)'
-        for match in re.finditer(vimeo_pattern, html_content):
-            video_id = match.group(1)
-            if video_id:
-                # 这里仅添加视频ID，实际使用中可能需要调用Vimeo API获取真实缩略图
-                logger.debug(f"检测到Vimeo视频ID: {video_id}，但需要API获取缩略图")
     
     def cleanup_old_cache(self):
         """清理过期的缓存文件"""
@@ -657,58 +1163,72 @@ class RSSFetcher:
             cutoff_date = datetime.now() - timedelta(days=self.max_cache_days)
             cutoff_timestamp = cutoff_date.timestamp()
             
-            # 清理数据目录中的旧文件
-            if os.path.exists(self.save_dir):
-                count = 0
-                for filename in os.listdir(self.save_dir):
-                    file_path = os.path.join(self.save_dir, filename)
-                    # 跳过目录和缓存文件
-                    if os.path.isdir(file_path) or filename.endswith('_processed_guids.json'):
-                        continue
-                        
-                    # 检查文件修改时间
-                    file_mtime = os.path.getmtime(file_path)
-                    if file_mtime < cutoff_timestamp:
-                        try:
-                            os.remove(file_path)
-                            count += 1
-                        except Exception as e:
-                            logger.warning(f"删除旧缓存文件时出错: {file_path}, {str(e)}")
-                            
-                if count > 0:
-                    logger.info(f"[{self.name}] 清理了 {count} 个过期缓存文件 (超过 {self.max_cache_days} 天)")
-                    
+            # 清理数据目录中的旧文件，跳过GUID缓存文件（包括追加日志）和条件请求信息
+            meta_prefix = os.path.basename(self.meta_file)
+            count = self._cleanup_dir(
+                self.save_dir,
+                lambda filename: '_processed_guids.json' not in filename and not filename.startswith(meta_prefix),
+                cutoff_timestamp
+            )
+            if count > 0:
+                logger.info(f"[{self.name}] 清理了 {count} 个过期缓存文件 (超过 {self.max_cache_days} 天)")
+                
+            # 清理图片缓存中长时间未使用的图片
+            img_count = self._cleanup_dir(self.img_cache_dir, None, cutoff_timestamp, recursive=True)
+            if img_count > 0:
+                logger.info(f"[{self.name}] 清理了 {img_count} 个过期图片缓存 (超过 {self.max_cache_days} 天未使用)")
+                
             # 清理TXT目录中的旧文件
-            if os.path.exists(self.txt_dir):
-                txt_count = 0
-                for filename in os.listdir(self.txt_dir):
-                    if not filename.startswith(self.name + '_update_'):
-                        continue
-                        
-                    file_path = os.path.join(self.txt_dir, filename)
-                    file_mtime = os.path.getmtime(file_path)
-                    if file_mtime < cutoff_timestamp:
-                        try:
-                            os.remove(file_path)
-                            txt_count += 1
-                        except Exception as e:
-                            logger.warning(f"删除旧TXT文件时出错: {file_path}, {str(e)}")
-                            
-                if txt_count > 0:
-                    logger.info(f"[{self.name}] 清理了 {txt_count} 个过期TXT文件 (超过 {self.max_cache_days} 天)")
+            txt_prefix = self.name + '_update_'
+            txt_count = self._cleanup_dir(self.txt_dir, lambda filename: filename.startswith(txt_prefix), cutoff_timestamp)
+            if txt_count > 0:
+                logger.info(f"[{self.name}] 清理了 {txt_count} 个过期TXT文件 (超过 {self.max_cache_days} 天)")
                     
         except Exception as e:
             logger.error(f"[{self.name}] 清理旧缓存时出错: {str(e)}")
     
-    @retry(max_retries=3, delay=3, exceptions=(requests.RequestException, socket.error, TimeoutError))
-    def download_images(self, image_urls: List[Tuple[str, str]]) -> List[Tuple[str, bytes]]:
-        """下载图片
+    def _cleanup_dir(self, path: str, predicate, cutoff_timestamp: float, recursive: bool = False) -> int:
+        """删除目录中修改时间早于截止时间的文件
+        
+        使用os.scandir遍历，文件类型直接取自目录项，每个文件只需一次stat
+        
+        Args:
+            path: 要清理的目录
+            predicate: 以文件名为参数的过滤函数，返回True的文件才会被清理；为None时清理所有文件
+            cutoff_timestamp: 截止时间戳
+            recursive: 是否递归清理子目录
+            
+        Returns:
+            删除的文件数
+        """
+        count = 0
+        try:
+            with os.scandir(path) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if recursive:
+                                count += self._cleanup_dir(entry.path, predicate, cutoff_timestamp, recursive)
+                            continue
+                        if predicate is not None and not predicate(entry.name):
+                            continue
+                        if entry.stat().st_mtime < cutoff_timestamp:
+                            os.remove(entry.path)
+                            count += 1
+                    except Exception as e:
+                        logger.warning(f"[{self.name}] 删除过期文件时出错: {entry.path}, {str(e)}")
+        except FileNotFoundError:
+            pass
+        return count
+        
+    def download_images(self, image_urls: List[Tuple[str, str]]) -> List[Tuple[str, bytes, str]]:
+        """并发下载图片
         
         Args:
             image_urls: 图片URL列表，每项为(content_id, image_url)元组
             
         Returns:
-            列表，每项为(content_id, image_data)元组
+            列表，每项为(content_id, image_data, subtype)元组
         """
         results = []
         
@@ -719,17 +1239,50 @@ class RSSFetcher:
             
         max_size_bytes = int(self.max_image_size_mb * 1024 * 1024)  # 转换为字节
         
-        for content_id, url in image_urls:
-            try:
-                # 设置较短的超时时间
-                response = requests.get(url, timeout=10, stream=True)
+        with ThreadPoolExecutor(max_workers=IMAGE_DOWNLOAD_WORKERS) as executor:
+            futures = {executor.submit(self._fetch_one_image, content_id, url, max_size_bytes): url
+                       for content_id, url in image_urls}
+            for future in as_completed(futures):
+                url = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    logger.warning(f"[{self.name}] 放弃下载图片: {url}, 错误: {str(e)}")
+                    continue
+                if result:
+                    results.append(result)
+                
+        return results
+    
+    @retry(max_retries=3, delay=3, exceptions=(requests.RequestException, socket.error, TimeoutError))
+    def _fetch_one_image(self, content_id: str, url: str, max_size_bytes: int) -> Optional[Tuple[str, bytes, str]]:
+        """下载单张图片，失败时单独重试
+        
+        Args:
+            content_id: 图片的Content-ID
+            url: 图片URL
+            max_size_bytes: 单张图片最大字节数
+            
+        Returns:
+            (content_id, image_data, subtype)元组，图片不符合要求时返回None
+        """
+        # 优先使用磁盘缓存，避免重复下载站点logo、头像等常见图片
+        cached = self._image_cache_get(url)
+        if cached is not None and len(cached[0]) <= max_size_bytes:
+            logger.debug(f"使用缓存图片: {url}, 大小: {len(cached[0])/1024:.1f}KB")
+            return (content_id,) + cached
+            
+        try:
+            # 设置较短的超时时间；跳过或中止读取时也保证连接被释放
+            with contextlib.closing(self._session.get(url, timeout=10, stream=True)) as response:
                 response.raise_for_status()
                 
                 # 检查Content-Type
                 content_type = response.headers.get('Content-Type', '')
                 if not content_type.startswith('image/'):
                     logger.warning(f"[{self.name}] 跳过非图片内容: {url}, Content-Type: {content_type}")
-                    continue
+                    return None
+                subtype = content_type.split(';', 1)[0].strip()[len('image/'):].lower() or 'jpeg'
                     
                 # 检查内容长度
                 content_length = response.headers.get('Content-Length')
@@ -737,25 +1290,66 @@ class RSSFetcher:
                     content_length = int(content_length)
                     if content_length > max_size_bytes:
                         logger.warning(f"[{self.name}] 图片太大，已跳过: {url}, 大小: {content_length/1024/1024:.2f}MB > {self.max_image_size_mb}MB")
-                        continue
+                        return None
                 
-                # 读取图片数据，并检查实际大小
-                img_data = response.content
-                if len(img_data) > max_size_bytes:
-                    logger.warning(f"[{self.name}] 图片实际大小超过限制，已跳过: {url}, 大小: {len(img_data)/1024/1024:.2f}MB > {self.max_image_size_mb}MB")
-                    continue
-                    
-                results.append((content_id, img_data))
-                logger.debug(f"已下载图片: {url}, 大小: {len(img_data)/1024:.1f}KB")
-                
-            except requests.RequestException as e:
-                logger.warning(f"下载图片失败: {url}, 错误: {str(e)}")
-                # 让retry装饰器处理重试
-                raise
-            except Exception as e:
-                logger.warning(f"处理图片时出错: {url}, 错误: {str(e)}")
-                
-        return results
+                # 分块读取图片数据，超过限制时立即中止，内存占用不超过max_size_bytes
+                buf = bytearray()
+                for chunk in response.iter_content(chunk_size=65536):
+                    buf.extend(chunk)
+                    if len(buf) > max_size_bytes:
+                        logger.warning(f"[{self.name}] 图片实际大小超过限制，已跳过: {url}, 大小: > {self.max_image_size_mb}MB")
+                        return None
+                        
+            img_data = bytes(buf)
+            self._image_cache_put(url, img_data, subtype)
+            logger.debug(f"已下载图片: {url}, 大小: {len(img_data)/1024:.1f}KB")
+            return content_id, img_data, subtype
+            
+        except requests.RequestException as e:
+            logger.warning(f"下载图片失败: {url}, 错误: {str(e)}")
+            # 让retry装饰器处理重试
+            raise
+        except Exception as e:
+            logger.warning(f"处理图片时出错: {url}, 错误: {str(e)}")
+            return None
+
+    def _image_cache_path(self, url: str) -> str:
+        """返回图片URL对应的缓存文件路径：img_cache/<哈希前两位>/<哈希>
+        
+        缓存文件以"image/<子类型>\n"开头，其后为图片数据
+        """
+        digest = _hash_hex(url.encode('utf-8'))
+        return os.path.join(self.img_cache_dir, digest[:2], digest)
+        
+    def _image_cache_get(self, url: str) -> Optional[Tuple[bytes, str]]:
+        """读取缓存的图片，返回(image_data, subtype)；缓存不存在或超过max_cache_days时返回None"""
+        path = self._image_cache_path(url)
+        try:
+            cutoff_timestamp = time.time() - self.max_cache_days * 86400
+            if os.stat(path).st_mtime < cutoff_timestamp:
+                return None
+            with open(path, 'rb') as f:
+                data = f.read()
+            # 更新修改时间，按最近使用时间淘汰
+            os.utime(path)
+            header, _, data = data.partition(b'\n')
+            return data, header[len(b'image/'):].decode('ascii', 'replace')
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.debug(f"读取图片缓存失败: {url}, 错误: {str(e)}")
+            return None
+            
+    def _image_cache_put(self, url: str, data: bytes, subtype: str):
+        """将图片数据和子类型写入缓存，先写临时文件再替换，避免并发读到不完整的文件"""
+        path = self._image_cache_path(url)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with _atomic_open(path) as f:
+                f.write(f"image/{subtype}\n".encode('ascii', 'replace'))
+                f.write(data)
+        except Exception as e:
+            logger.debug(f"写入图片缓存失败: {url}, 错误: {str(e)}")
 
     def replace_image_urls_with_cids(self, html_content: str, image_map: Dict[str, str]) -> str:
         """将HTML中的图片URL替换为Content-ID引用
@@ -770,18 +1364,30 @@ class RSSFetcher:
         if not html_content or not image_map:
             return html_content
             
-        for url, cid in image_map.items():
-            # 替换图片URL为cid引用
-            html_content = html_content.replace(f'src="{url}"', f'src="cid:{cid}"')
-            html_content = html_content.replace(f"src='{url}'", f'src="cid:{cid}"')
+        def replace_src(match):
+            url = match.group(1) if match.group(1) is not None else match.group(2)
+            # 映射中的URL已解码HTML实体，原样查找不到时再按解码后的URL查找
+            content_id = image_map.get(url) or image_map.get(safe_unescape(url))
+            return f'src="cid:{content_id}"' if content_id else match.group(0)
             
-        return html_content
+        # 一次扫描所有src属性，按字典查找对应的Content-ID
+        return _SRC_RE.sub(replace_src, html_content)
+
+class FetcherEntry(NamedTuple):
+    """RSS源的获取器及其抓取间隔（分钟）"""
+    fetcher: RSSFetcher
+    interval: int
 
 class RSSManager:
-    def __init__(self, config_file: str = 'config.json'):
+    def __init__(self, config_file: str = 'config.json', debug: bool = False):
         self.config_file = config_file
-        self.fetchers: Dict[str, RSSFetcher] = {}
-        self.executor = ThreadPoolExecutor(max_workers=5)  # 最多5个并发任务
+        self.debug = debug  # 调试模式下记录完整配置内容
+        self.fetchers: Dict[str, FetcherEntry] = {}
+        self.email_sender: Optional[EmailSender] = None
+        self.worker_threads = DEFAULT_WORKER_THREADS
+        self.executor: Optional[ThreadPoolExecutor] = None  # 在load_config中按配置创建
+        self.session: Optional[requests.Session] = None  # 所有获取器共用的HTTP会话
+        self._futures: Dict[str, Future] = {}  # 每个RSS源最近一次提交的定时获取任务
         self.load_config()
         
     def validate_config(self, config: Dict[str, Any]) -> bool:
@@ -794,91 +1400,30 @@ class RSSManager:
             配置是否有效
         """
         try:
-            # 检查必需的配置部分
-            if 'email_config' not in config:
-                logger.error("配置错误: 缺少 'email_config' 部分")
-                return False
-                
-            email_config = config['email_config']
-            required_email_fields = ['smtp_server', 'smtp_port', 'sender_email', 
-                                     'sender_password', 'receiver_emails']
-            
-            for field in required_email_fields:
-                if field not in email_config:
-                    logger.error(f"配置错误: 'email_config' 中缺少 '{field}' 字段")
-                    return False
-            
-            # 验证SMTP端口
-            if not isinstance(email_config['smtp_port'], int):
-                logger.error(f"配置错误: 'smtp_port' 必须是整数，当前值: {email_config['smtp_port']}")
-                return False
-                
-            # 校验发件人邮箱
-            sender_email = email_config['sender_email']
-            if not isinstance(sender_email, str) or '@' not in sender_email or '.' not in sender_email:
-                logger.error(f"配置错误: 'sender_email' 不是有效的电子邮件地址: {sender_email}")
-                return False
-            
-            # 校验收件人邮箱列表
-            for recv_email in email_config.get('receiver_emails', []):
-                if not isinstance(recv_email, str) or '@' not in recv_email or '.' not in recv_email:
-                    logger.error(f"配置错误: 'receiver_emails' 中存在无效邮箱: {recv_email}")
-                    return False
+            _validate_config_schema(config)
+        except fastjsonschema.JsonSchemaException as e:
+            logger.error(f"配置错误: {e.message}")
+            return False
             
-            # 检查RSS源配置
-            if 'rss_sources' not in config or not config['rss_sources']:
-                logger.error("配置错误: 缺少 'rss_sources' 部分或为空")
+        # 整数字段不允许写成浮点数，否则用于切片等操作时会出错
+        int_fields = [('email_config.smtp_port', config['email_config']['smtp_port'])]
+        if 'worker_threads' in config:
+            int_fields.append(('worker_threads', config['worker_threads']))
+        for source in config['rss_sources']:
+            int_fields.extend((f"rss_sources[{source['name']}].{field}", source[field])
+                              for field in _INT_SOURCE_FIELDS if field in source)
+        for field, value in int_fields:
+            if not isinstance(value, int):
+                logger.error(f"配置错误: {field} 必须是整数")
                 return False
-                
-            for i, source in enumerate(config['rss_sources']):
-                if 'name' not in source:
-                    logger.error(f"配置错误: RSS源 #{i+1} 缺少 'name' 字段")
-                    return False
-                if 'url' not in source:
-                    logger.error(f"配置错误: RSS源 '{source.get('name', f'#{i+1}')}' 缺少 'url' 字段")
-                    return False
-                    
-                # 验证时间间隔
-                if 'interval_minutes' in source and (
-                    not isinstance(source['interval_minutes'], int) or 
-                    source['interval_minutes'] < 1
-                ):
-                    logger.error(f"配置错误: RSS源 '{source.get('name')}' 的 'interval_minutes' 必须是正整数")
-                    return False
-                    
-                # 验证资源限制参数
-                if 'max_cache_days' in source and (
-                    not isinstance(source['max_cache_days'], int) or 
-                    source['max_cache_days'] < 1
-                ):
-                    logger.error(f"配置错误: RSS源 '{source.get('name')}' 的 'max_cache_days' 必须是正整数")
-                    return False
-                    
-                if 'max_image_size_mb' in source and (
-                    not isinstance(source['max_image_size_mb'], (int, float)) or 
-                    source['max_image_size_mb'] <= 0
-                ):
-                    logger.error(f"配置错误: RSS源 '{source.get('name')}' 的 'max_image_size_mb' 必须是正数")
-                    return False
-                    
-                if 'max_images_per_mail' in source and (
-                    not isinstance(source['max_images_per_mail'], int) or 
-                    source['max_images_per_mail'] < 1
-                ):
-                    logger.error(f"配置错误: RSS源 '{source.get('name')}' 的 'max_images_per_mail' 必须是正整数")
-                    return False
-                    
-            # 检查RSS源名称唯一性
-            names = [source['name'] for source in config['rss_sources']]
-            if len(names) != len(set(names)):
-                logger.error("配置错误: RSS源名称必须唯一")
-                return False
-                
-            return True
             
-        except Exception as e:
-            logger.error(f"验证配置时出错: {str(e)}")
+        # 检查RSS源名称唯一性（JSON Schema无法表达按字段唯一）
+        names = [source['name'] for source in config['rss_sources']]
+        if len(names) != len(set(names)):
+            logger.error("配置错误: RSS源名称必须唯一")
             return False
+            
+        return True
         
     def load_config(self):
         """从配置文件加载RSS源配置"""
@@ -893,10 +1438,27 @@ class RSSManager:
                 logger.error("配置验证失败，程序将退出")
                 sys.exit(1)
                 
-            # 创建邮件发送器
+            # 创建邮件发送器，并关闭旧发送器持有的SMTP连接
             email_sender = EmailSender(config['email_config'])
+            if self.email_sender:
+                self.email_sender.close()
+            self.email_sender = email_sender
+            
+            # 按配置创建线程池；旧线程池中正在执行的任务继续完成，不阻塞重新加载
+            self.worker_threads = config.get('worker_threads', DEFAULT_WORKER_THREADS)
+            old_executor = self.executor
+            self.executor = ThreadPoolExecutor(max_workers=self.worker_threads, thread_name_prefix='rss-fetch')
+            if old_executor:
+                old_executor.shutdown(wait=False)
+                
+            # 所有RSS源共用一个HTTP会话，RSS源通常位于同一主机（base_rss_url），可复用已建立的连接；
+            # 旧会话可能仍被正在执行的获取使用，不主动关闭
+            self.session = _create_http_session(max(HTTP_POOL_SIZE, self.worker_threads))
                 
-            logger.info(f"读取到的配置内容: {json.dumps(config, ensure_ascii=False, indent=2)}")
+            # 仅在调试模式下序列化完整配置，并隐藏邮箱密码
+            if self.debug:
+                safe_config = {**config, 'email_config': {**config['email_config'], 'sender_password': '***'}}
+                logger.debug("读取到的配置内容: %s", json.dumps(safe_config, ensure_ascii=False, indent=2))
             logger.info(f"RSS源列表: {[source['name'] for source in config['rss_sources']]}")
                 
             # 清除现有的定时任务
@@ -917,20 +1479,21 @@ class RSSManager:
                     txt_dir=source.get('txt_dir', DEFAULT_TXT_DIR),
                     max_cache_days=source.get('max_cache_days', 30),
                     max_image_size_mb=source.get('max_image_size_mb', 10.0),
-                    max_images_per_mail=source.get('max_images_per_mail', 20)
+                    max_images_per_mail=source.get('max_images_per_mail', 20),
+                    max_feed_size_mb=source.get('max_feed_size_mb'),
+                    session=self.session
                 )
-                self.fetchers[name] = fetcher
-                
                 # 设置定时任务，使用线程池执行
                 interval = source.get('interval_minutes', 5)  # 默认5分钟检查一次
-                schedule.every(interval).minutes.do(
-                    lambda f=fetcher: self.executor.submit(f.fetch_rss)
-                )
+                self.fetchers[name] = FetcherEntry(fetcher, interval)
+                job = schedule.every(interval).minutes.do(self._schedule_fetch, fetcher)
+                # 随机推迟首次执行，之后的执行时间保持这一偏移，间隔相同的RSS源不会同时触发
+                job.next_run += timedelta(seconds=random.uniform(0, SCHEDULE_JITTER_SECONDS))
                 logger.info(f"已设置定时任务，间隔: {interval}分钟")
                 
             logger.info(f"\n成功加载 {len(self.fetchers)} 个RSS源:")
-            for name, fetcher in self.fetchers.items():
-                logger.info(f"- {name}: {fetcher.url}")
+            for name, entry in self.fetchers.items():
+                logger.info(f"- {name}: {entry.fetcher.url}")
             
         except Exception as e:
             logger.error(f"加载配置文件时出错: {str(e)}")
@@ -938,6 +1501,26 @@ class RSSManager:
             logger.error(traceback.format_exc())
             sys.exit(1)
         
+    def _schedule_fetch(self, fetcher: RSSFetcher):
+        """定时任务回调：同一RSS源上一次获取尚未结束时跳过本次，避免任务在线程池中堆积"""
+        future = self._futures.get(fetcher.name)
+        if future is not None and not future.done():
+            logger.info(f"[{fetcher.name}] 上一次获取尚未完成，跳过本次定时任务")
+            return
+        self._futures[fetcher.name] = self.executor.submit(self._fetch, fetcher)
+        
+    def _fetch(self, fetcher: RSSFetcher):
+        """在邮件发送批次中执行一次获取，同时进行的获取共用一个SMTP连接"""
+        with fetcher.email_sender.batch():
+            fetcher.fetch_rss()
+            
+    def shutdown(self):
+        """等待正在执行的任务结束，并释放SMTP连接"""
+        if self.executor:
+            self.executor.shutdown(wait=True)
+        if self.email_sender:
+            self.email_sender.close()
+        
     def reload_config(self):
         """重新加载配置文件"""
         logger.info("重新加载配置文件...")
@@ -948,30 +1531,59 @@ class RSSManager:
         try:
             # 先并发执行一次所有获取器
             logger.info("\n执行首次RSS获取...")
-            futures = [self.executor.submit(fetcher.fetch_rss) 
-                      for fetcher in self.fetchers.values()]
+            futures = [self.executor.submit(self._fetch, entry.fetcher) 
+                      for entry in self.fetchers.values()]
             for future in futures:
                 future.result()  # 等待所有首次获取完成
             
             logger.info("\n开始监听RSS更新...")
             logger.info("程序将持续运行，监听以下RSS源的更新:")
-            for name, fetcher in self.fetchers.items():
-                logger.info(f"- {name}: 每{schedule.jobs[0].interval}分钟检查一次")
+            for name, entry in self.fetchers.items():
+                logger.info(f"- {name}: 每{entry.interval}分钟检查一次")
             logger.info("\n每当任何源有新文章时，都会自动保存到TXT文件并发送邮件\n")
             
-            # 持续运行定时任务
+            # 持续运行定时任务，每次休眠到下一个任务到期为止（最多60秒，保证能及时响应退出信号）
             while True:
                 schedule.run_pending()
-                time.sleep(10)  # 降低CPU使用率
+                idle = schedule.idle_seconds()
+                if idle is None:  # 没有定时任务
+                    idle = 60
+                time.sleep(min(max(idle, 1), 60))
                 
         except KeyboardInterrupt:
             logger.info("\n正在关闭RSS监听...")
-            self.executor.shutdown(wait=True)
-            logger.info("程序已安全退出")
         except Exception as e:
             logger.error(f"运行时出错: {str(e)}")
-            self.executor.shutdown(wait=True)
+        finally:
+            # 信号处理器通过sys.exit退出时抛出SystemExit，也需要关闭SMTP连接
+            self.shutdown()
+            logger.info("程序已安全退出")
+
+def run_all(fetchers: List[RSSFetcher], max_workers: int = 8):
+    """并发执行多个RSS获取器，等待全部完成
+    
+    获取RSS和发送邮件都是网络I/O，线程在等待socket时会释放GIL，
+    因此多个源可以重叠等待时间。
+    
+    Args:
+        fetchers: RSS获取器列表
+        max_workers: 最大并发线程数
+    """
+    # 所有获取期间保持各邮件发送器的SMTP连接，全部完成后关闭
+    senders = {id(fetcher.email_sender): fetcher.email_sender for fetcher in fetchers}
+    with contextlib.ExitStack() as stack, ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for sender in senders.values():
+            stack.enter_context(sender.batch())
+        futures = {executor.submit(fetcher.fetch_rss): fetcher.name for fetcher in fetchers}
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                future.result()
+                logger.info(f"RSS获取完成: {name}")
+            except Exception as e:
+                logger.error(f"RSS获取失败: {name}, 错误: {str(e)}")
 
+@lru_cache(maxsize=4096)
 def safe_unescape(url_str):
     """安全地解码URL字符串，处理可能的HTML实体
     
@@ -983,6 +1595,9 @@ def safe_unescape(url_str):
     """
     if not url_str:
         return ''
+    # 绝大多数URL不含实体，无需进入html.unescape的正则匹配
+    if '&' not in url_str:
+        return url_str
     try:
         return html.unescape(url_str)
     except Exception as e:
@@ -1040,29 +1655,19 @@ def main():
         logger.info(f"当前时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
         
         # 创建并运行RSS管理器
-        manager = RSSManager(args.config)
+        manager = RSSManager(args.config, debug=args.debug)
         
         # 如果是一次性运行模式
         if args.once:
             logger.info("一次性运行模式，只获取一次RSS")
             
             # 并发获取所有RSS源
-            futures = []
-            for name, fetcher in manager.fetchers.items():
+            for name in manager.fetchers:
                 logger.info(f"获取RSS: {name}")
-                future = manager.executor.submit(fetcher.fetch_rss)
-                futures.append((name, future))
-                
-            # 等待所有获取任务完成
-            for name, future in futures:
-                try:
-                    future.result()
-                    logger.info(f"RSS获取完成: {name}")
-                except Exception as e:
-                    logger.error(f"RSS获取失败: {name}, 错误: {str(e)}")
+            run_all([entry.fetcher for entry in manager.fetchers.values()], max_workers=manager.worker_threads)
                     
             logger.info("所有RSS源获取完成，程序退出")
-            manager.executor.shutdown(wait=True)
+            manager.shutdown()
         else:
             # 持续监听模式
             manager.run()